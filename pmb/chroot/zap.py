@@ -47,6 +47,7 @@ def zap(
     distfiles: bool = False,
     rust: bool = False,
     netboot: bool = False,
+    apkbuild_cache: bool = False,
 ) -> None:
     """
     Shutdown everything inside the chroots (e.g. adb), umount
@@ -62,6 +63,7 @@ def zap(
     :param distfiles: Clear the downloaded files cache
     :param rust: Remove rust related caches
     :param netboot: Remove images for netboot
+    :param apkbuild_cache: Remove the cache of parsed APKBUILDs
 
     NOTE: This function gets called in pmb/config/init.py, with only get_context().config.work
     and args.device set!
@@ -89,6 +91,8 @@ def zap(
         patterns += ["cache_rust"]
     if netboot:
         patterns += ["images_netboot"]
+    if apkbuild_cache:
+        patterns += ["cache_apkbuild"]
 
     for chroot in Chroot.glob():
         del_chroot(chroot, confirm, dry)
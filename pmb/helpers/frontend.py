@@ -533,6 +533,7 @@ def zap(args: PmbArgs) -> None:
         pkgs_online_mismatch=args.pkgs_online_mismatch,
         rust=args.rust,
         netboot=args.netboot,
+        apkbuild_cache=args.apkbuild_cache,
     )
 
     # Don't write the "Done" message
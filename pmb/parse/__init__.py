@@ -3,6 +3,7 @@
 from pmb.parse.arguments import arguments, arguments_install, arguments_flasher, get_parser
 from pmb.parse._apkbuild import apkbuild
 from pmb.parse._apkbuild import function_body
+from pmb.parse._apkbuild import parse_many
 from pmb.parse.binfmt_info import binfmt_info
 from pmb.parse.deviceinfo import deviceinfo
 from pmb.parse.kconfig import check
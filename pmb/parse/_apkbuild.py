@@ -1,12 +1,18 @@
 # Copyright 2023 Oliver Smith
 # SPDX-License-Identifier: GPL-3.0-or-later
-# mypy: disable-error-code="attr-defined"
 from pmb.core.context import get_context
 from pmb.helpers import logging
 from pmb.types import Apkbuild
+import bisect
+import concurrent.futures
+import hashlib
+import itertools
+import json
+import multiprocessing
 import os
 from pathlib import Path
 import re
+import threading
 from collections import OrderedDict
 from typing import Any
 
@@ -17,84 +23,60 @@ import pmb.parse.version
 
 # sh variable name regex: https://stackoverflow.com/a/2821201/3527128
 
-# ${foo}
-revar = re.compile(r"\${([a-zA-Z_]+[a-zA-Z0-9_]*)}")
-
-# $foo
-revar2 = re.compile(r"\$([a-zA-Z_]+[a-zA-Z0-9_]*)")
-
-# ${var/foo/bar}, ${var/foo/}, ${var/foo} -- replace foo with bar
-revar3 = re.compile(r"\${([a-zA-Z_]+[a-zA-Z0-9_]*)/([^/]+)(?:/([^/]*?))?}")
-
-# ${foo#bar} -- cut off bar from foo from start of string
-revar4 = re.compile(r"\${([a-zA-Z_]+[a-zA-Z0-9_]*)#(.*)}")
-
-# foo=
-revar5 = re.compile(r"([a-zA-Z_]+[a-zA-Z0-9_]*)=")
+# ${foo}, $foo, ${var/foo/bar}, ${var/foo/}, ${var/foo}, ${foo#bar}
+revar = re.compile(
+    # ${foo}
+    r"\${(?P<brace>[a-zA-Z_]\w*)}"
+    # $foo
+    r"|\$(?P<bare>[a-zA-Z_]\w*)"
+    # ${var/foo/bar}, ${var/foo/}, ${var/foo} -- replace foo with bar. foo and
+    # bar may reference variables themselves ($x or ${x}), so "}" only ends
+    # them if it doesn't close such a reference.
+    r"|\${(?P<replace>[a-zA-Z_]\w*)"
+    r"/(?P<search>(?:\${[a-zA-Z_]\w*}|[^/}])+)"
+    r"(?:/(?P<replacement>(?:\${[a-zA-Z_]\w*}|[^/}])*?))?}"
+    # ${foo#bar} -- cut off bar from foo from start of string
+    r"|\${(?P<cut>[a-zA-Z_]\w*)#(?P<prefix>(?:\${[a-zA-Z_]\w*}|[^}])*)}",
+    re.ASCII,
+)
+_revar_sub = revar.sub
+
+# name() { -- start of a function, or } at the start of a line -- its end
+refunc = re.compile(r"^(?:(?P<func>\w+)\(\)[ \t]*\{|\})", re.ASCII | re.MULTILINE)
 
 
 def replace_variable(apkbuild: Apkbuild, value: str) -> str:
-    def log_key_not_found(match: re.Match) -> None:
-        logging.verbose(
-            f"{apkbuild['pkgname']}: key '{match.group(1)}' for"
-            f" replacing '{match.group(0)}' not found, ignoring"
-        )
+    # Most values (pkgrel, arch, license, ...) don't reference any variable
+    if "$" not in value:
+        return value
 
-    # ${foo}
-    for match in revar.finditer(value):
+    def sub(match: re.Match[str]) -> str:
+        key = match["brace"] or match["bare"] or match["replace"] or match["cut"]
         try:
-            logging.verbose(
-                "{}: replace '{}' with '{}'".format(
-                    apkbuild["pkgname"], match.group(0), apkbuild[match.group(1)]
-                )
-            )
-            value = value.replace(match.group(0), apkbuild[match.group(1)], 1)
+            newvalue: str = apkbuild[key]
         except KeyError:
-            log_key_not_found(match)
-
-    # $foo
-    for match in revar2.finditer(value):
-        try:
-            newvalue = apkbuild[match.group(1)]
             logging.verbose(
-                "{}: replace '{}' with '{}'".format(apkbuild["pkgname"], match.group(0), newvalue)
+                "%s: key '%s' for replacing '%s' not found, ignoring",
+                apkbuild["pkgname"],
+                key,
+                match.group(0),
             )
-            value = value.replace(match.group(0), newvalue, 1)
-        except KeyError:
-            log_key_not_found(match)
+            return match.group(0)
 
-    # ${var/foo/bar}, ${var/foo/}, ${var/foo}
-    for match in revar3.finditer(value):
-        try:
-            newvalue = apkbuild[match.group(1)]
-            search = match.group(2)
-            replacement = match.group(3)
+        if match["replace"]:
+            search = _revar_sub(sub, match["search"])
+            replacement = match["replacement"]
             if replacement is None:  # arg 3 is optional
                 replacement = ""
-            newvalue = newvalue.replace(search, replacement, 1)
-            logging.verbose(
-                "{}: replace '{}' with '{}'".format(apkbuild["pkgname"], match.group(0), newvalue)
-            )
-            value = value.replace(match.group(0), newvalue, 1)
-        except KeyError:
-            log_key_not_found(match)
+            newvalue = newvalue.replace(search, _revar_sub(sub, replacement), 1)
+        elif match["cut"]:
+            newvalue = newvalue.removeprefix(_revar_sub(sub, match["prefix"]))
 
-    # ${foo#bar}
-    rematch4 = revar4.finditer(value)
-    for match in rematch4:
-        try:
-            newvalue = apkbuild[match.group(1)]
-            substr = match.group(2)
-            if newvalue.startswith(substr):
-                newvalue = newvalue.replace(substr, "", 1)
-            logging.verbose(
-                "{}: replace '{}' with '{}'".format(apkbuild["pkgname"], match.group(0), newvalue)
-            )
-            value = value.replace(match.group(0), newvalue, 1)
-        except KeyError:
-            log_key_not_found(match)
+        # Let logging format the message only if verbose logging is enabled
+        logging.verbose("%s: replace '%s' with '%s'", apkbuild["pkgname"], match.group(0), newvalue)
+        return newvalue
 
-    return value
+    return _revar_sub(sub, value)
 
 
 def function_body(path: Path, func: str) -> list[str]:
@@ -105,21 +87,12 @@ def function_body(path: Path, func: str) -> list[str]:
     :param func: name of function to get the body of.
     :returns: function body in an array of strings.
     """
-    func_body = []
-    in_func = False
     lines = read_file(path)
-    for line in lines:
-        if in_func:
-            if line.startswith("}"):
-                in_func = False
-                break
-            func_body.append(line)
-            continue
-        else:
-            if line.startswith(func + "() {"):
-                in_func = True
-                continue
-    return func_body
+    func_range = _function_ranges(lines).get(func)
+    if func_range is None:
+        return []
+    start, end = func_range
+    return lines[start : end or None]
 
 
 def read_file(path: Path) -> list[str]:
@@ -136,6 +109,37 @@ def read_file(path: Path) -> list[str]:
     return lines
 
 
+def _function_ranges(lines: list[str]) -> dict[str, tuple[int, int]]:
+    """
+    Find all function definitions in an APKBUILD in one pass.
+
+    A function starts at a line like "name() {" and ends at the next line
+    that starts with "}".
+
+    :param lines: lines of the APKBUILD
+    :returns: dict of function name to (start, end), where start is the
+              index of the first line of the function body and end is the
+              index of the closing "}" line (0 if there is none)
+    """
+    # Offsets of the lines in the joined source, to map matches back to
+    # line indices
+    line_starts = list(itertools.accumulate(map(len, lines), initial=0))
+
+    ret: dict[str, tuple[int, int]] = {}
+    unclosed: list[str] = []
+    for match in refunc.finditer("".join(lines)):
+        i = bisect.bisect_right(line_starts, match.start()) - 1
+        func = match["func"]
+        if func is None:
+            for name in unclosed:
+                ret[name] = (ret[name][0], i)
+            unclosed.clear()
+        elif func not in ret:
+            ret[func] = (i + 1, 0)
+            unclosed.append(func)
+    return ret
+
+
 def parse_next_attribute(
     lines: list[str], i: int, path: Path
 ) -> tuple[str, str, int] | tuple[None, None, int]:
@@ -159,21 +163,23 @@ def parse_next_attribute(
               value: that was parsed from the line
               i: line that was parsed last
     """
-    # Check for and cut off "attribute="
-    rematch5 = revar5.match(lines[i])
-    if not rematch5:
+    # Check for and cut off "attribute=". Most lines are not assignments,
+    # so bail out with cheap string checks instead of running a regex.
+    line = lines[i]
+    eq = line.find("=")
+    if eq <= 0:
+        return (None, None, i)
+    attribute = line[:eq]
+    if not attribute.isascii() or not attribute.isidentifier():
         return (None, None, i)
-    attribute = rematch5.group(0)
-    value = lines[i][len(attribute) : -1]
-    attribute = rematch5.group(0).rstrip("=")
+    value = line[eq + 1 : -1]
 
     # Determine end quote sign
-    end_char = None
-    for char in ["'", '"']:
-        if value.startswith(char):
-            end_char = char
-            value = value[1:]
-            break
+    end_char = value[:1]
+    if end_char in ("'", '"'):
+        value = value[1:]
+    else:
+        end_char = ""
 
     # Single line
     if not end_char:
@@ -183,15 +189,16 @@ def parse_next_attribute(
         value = value.split(end_char, 1)[0]
         return (attribute, value, i)
 
-    # Parse lines until reaching end quote
+    # Parse lines until reaching end quote. Collect them in a list and join
+    # once at the end, this is faster than growing a str or bytearray.
+    parts = [value]
     i += 1
     while i < len(lines):
         line = lines[i]
-        value += " "
         if end_char in line:
-            value += line.split(end_char, 1)[0].strip()
-            return (attribute, value.strip(), i)
-        value += line.strip()
+            parts.append(line.split(end_char, 1)[0].strip())
+            return (attribute, " ".join(parts).strip(), i)
+        parts.append(line.strip())
         i += 1
 
     raise RuntimeError(
@@ -207,22 +214,32 @@ def _parse_attributes(
     from ret (if found) and split into the format configured in
     apkbuild_attributes.
 
+    Variables not in apkbuild_attributes are kept in ret as well, so they
+    can be used for replacing variables mentioned later. Callers need to
+    pick the attributes they are interested in from ret afterwards.
+
     :param lines: the lines to parse
     :param apkbuild_attributes: the attributes to parse
     :param ret: a dict to update with new parsed variable
     """
-    # Parse all variables first, and replace variables mentioned earlier
-    for i in range(len(lines)):
+    # Parse all variables first, and replace variables mentioned earlier.
+    # Continue after the last line of multi-line values, instead of looking
+    # at each of their lines again.
+    i = 0
+    while i < len(lines):
         attribute, value, i = parse_next_attribute(lines, i, path)
+        i += 1
         if not attribute or not value:
             continue
         ret[attribute] = replace_variable(ret, value)
 
     if "subpackages" in apkbuild_attributes:
-        subpackages: OrderedDict[str, str] = OrderedDict()
-        for subpkg in ret["subpackages"].split(" "):
-            if subpkg:
-                _parse_subpackage(path, lines, ret, subpackages, subpkg)
+        subpackages: OrderedDict[str, dict[str, Any] | None] = OrderedDict()
+        subpkgs = [subpkg for subpkg in ret["subpackages"].split(" ") if subpkg]
+        # Find all functions once for all subpackages (if there are any)
+        func_ranges = _function_ranges(lines) if subpkgs else {}
+        for subpkg in subpkgs:
+            _parse_subpackage(path, lines, func_ranges, ret, subpackages, subpkg)
         ret["subpackages"] = subpackages
 
     # Split attributes
@@ -236,14 +253,15 @@ def _parse_attributes(
             else:
                 ret[attribute] = 0
 
-    # Remove variables not in attributes
-    for attribute in list(ret.keys()):
-        if attribute not in apkbuild_attributes:
-            del ret[attribute]
-
 
 def _parse_subpackage(
-    path: Path, lines: list[str], apkbuild: Apkbuild, subpackages: dict[str, Any], subpkg: str
+    path: Path,
+    lines: list[str],
+    func_ranges: dict[str, tuple[int, int]],
+    apkbuild: Apkbuild,
+    subpackages: dict[str, dict[str, Any] | None],
+    subpkg: str,
+    attributes: dict[str, dict[str, bool]] | None = None,
 ) -> None:
     """
     Attempt to parse attributes from a subpackage function.
@@ -252,11 +270,17 @@ def _parse_subpackage(
 
     :param path: path to APKBUILD
     :param lines: the lines to parse
+    :param func_ranges: function definitions in lines, see _function_ranges()
     :param apkbuild: dict of attributes already parsed from APKBUILD
     :param subpackages: the subpackages dict to update
     :param subpkg: the subpackage to parse
                    (may contain subpackage function name separated by :)
+    :param attributes: the attributes to parse from the subpackage function
+                       (default: pmb.config.apkbuild_package_attributes)
     """
+    if attributes is None:
+        attributes = pmb.config.apkbuild_package_attributes
+
     subpkgparts = subpkg.split(":")
     subpkgname = subpkgparts[0]
     subpkgsplit = subpkgname[subpkgname.rfind("-") + 1 :]
@@ -275,14 +299,7 @@ def _parse_subpackage(
         subpkgsplit = subpkgparts[1]
 
     # Find start and end of package function
-    start = end = 0
-    prefix = subpkgsplit + "() {"
-    for i in range(len(lines)):
-        if lines[i].startswith(prefix):
-            start = i + 1
-        elif start and lines[i].startswith("}"):
-            end = i
-            break
+    start, end = func_ranges.get(subpkgsplit, (0, 0))
 
     if not start:
         # Unable to find subpackage function in the APKBUILD.
@@ -293,15 +310,17 @@ def _parse_subpackage(
         # an exception here for all other missing subpackage functions.
         subpackages[subpkgname] = None
         logging.verbose(
-            f"{apkbuild['pkgname']}: subpackage function '{subpkgsplit}' for "
-            f"subpackage '{subpkgname}' not found, ignoring"
+            "%s: subpackage function '%s' for subpackage '%s' not found, ignoring",
+            apkbuild["pkgname"],
+            subpkgsplit,
+            subpkgname,
         )
         return
 
     if not end:
         raise RuntimeError(
             f"Could not find end of subpackage function, no line starts with "
-            f"'}}' after '{prefix}' in {path}"
+            f"'}}' after '{subpkgsplit}() {{' in {path}"
         )
 
     lines = lines[start:end]
@@ -319,13 +338,87 @@ def _parse_subpackage(
     apkbuild["_pmb_recommends"] = ""
 
     # Parse relevant attributes for the subpackage
-    _parse_attributes(path, lines, pmb.config.apkbuild_package_attributes, apkbuild)
+    _parse_attributes(path, lines, attributes, apkbuild)
 
     # Return only properties interesting for subpackages
-    ret = {}
-    for key in pmb.config.apkbuild_package_attributes:
-        ret[key] = apkbuild[key]
-    subpackages[subpkgname] = ret
+    subpackages[subpkgname] = {key: apkbuild[key] for key in attributes}
+
+
+@Cache()
+def _apkbuild_cache_fingerprint() -> str:
+    """
+    Hash the parser code and the attribute config, so entries in
+    $WORK/cache_apkbuild get invalidated whenever the output of the parser
+    may change, also when running pmbootstrap from a git checkout.
+    """
+    fingerprint = hashlib.sha256(Path(__file__).read_bytes())
+    config = repr(pmb.config.apkbuild_attributes) + repr(pmb.config.apkbuild_package_attributes)
+    fingerprint.update(config.encode("utf-8"))
+    return fingerprint.hexdigest()
+
+
+def _parse_apkbuild(path: Path) -> Apkbuild:
+    """
+    Read an APKBUILD and parse all attributes from pmb.config.apkbuild_attributes.
+
+    :param path: full path to the APKBUILD
+    :returns: relevant variables from the APKBUILD, see apkbuild()
+    """
+    # Read the file and check line endings
+    lines = read_file(path)
+
+    # Parse all attributes from the config
+    variables = dict.fromkeys(pmb.config.apkbuild_attributes, "")
+    _parse_attributes(path, lines, pmb.config.apkbuild_attributes, variables)
+
+    # Remove variables not in attributes
+    return {key: variables[key] for key in pmb.config.apkbuild_attributes}
+
+
+def _parse_apkbuild_cached(path: Path) -> Apkbuild:
+    """
+    Parse an APKBUILD, or load the result from $WORK/cache_apkbuild if the
+    same content was parsed in a previous pmbootstrap run.
+
+    :param path: full path to the APKBUILD
+    :returns: relevant variables from the APKBUILD, see apkbuild()
+    """
+    context = get_context(allow_failure=True)
+    if context is None or not context.config.work.exists():
+        return _parse_apkbuild(path)
+
+    # Use the content instead of mtime and size: the APKBUILD may get edited
+    # without changing its size within the timestamp granularity of the file
+    # system (e.g. pkgrel bumps), and reading it is cheap compared to parsing
+    content = hashlib.sha256(path.read_bytes()).hexdigest()
+    key = [pmb.__version__, _apkbuild_cache_fingerprint(), content]
+    cache_dir = context.config.work / "cache_apkbuild"
+    cache_file = cache_dir / hashlib.sha256(str(path).encode("utf-8")).hexdigest()
+    try:
+        with cache_file.open(encoding="utf-8") as handle:
+            cached = json.load(handle)
+        if cached["key"] == key:
+            ret: Apkbuild = cached["apkbuild"]
+            return ret
+    except (OSError, ValueError, KeyError, TypeError):
+        # Not cached yet or unreadable, parse it again
+        pass
+
+    ret = _parse_apkbuild(path)
+
+    # Write to a temporary file first, so pmbootstrap running in parallel
+    # never reads a partially written cache file
+    cache_file_tmp = cache_file.with_name(f"{cache_file.name}.{os.getpid()}")
+    try:
+        cache_dir.mkdir(exist_ok=True)
+        with cache_file_tmp.open("w", encoding="utf-8") as handle:
+            json.dump({"key": key, "apkbuild": ret}, handle)
+        cache_file_tmp.replace(cache_file)
+    except OSError as e:
+        # The cache is optional, e.g. the work dir may be read-only or full
+        logging.verbose(f"{path}: failed to write APKBUILD cache: {e}")
+        cache_file_tmp.unlink(missing_ok=True)
+    return ret
 
 
 @Cache("path")
@@ -349,17 +442,11 @@ def apkbuild(path: Path, check_pkgver: bool = True, check_pkgname: bool = True)
     if not path.exists():
         raise FileNotFoundError(f"{path.relative_to(get_context().config.work)} not found!")
 
-    # Read the file and check line endings
-    lines = read_file(path)
-
-    # Parse all attributes from the config
-    ret = {key: "" for key in pmb.config.apkbuild_attributes.keys()}
-    _parse_attributes(path, lines, pmb.config.apkbuild_attributes, ret)
+    ret = _parse_apkbuild_cached(path)
 
     # Sanity check: pkgname
-    suffix = f"/{ret['pkgname']}/APKBUILD"
     if check_pkgname:
-        if not os.path.realpath(path).endswith(suffix):
+        if path.resolve().parent.name != ret["pkgname"]:
             logging.info(f"Folder: '{os.path.dirname(path)}'")
             logging.info(f"Pkgname: '{ret['pkgname']}'")
             raise RuntimeError(
@@ -379,6 +466,99 @@ def apkbuild(path: Path, check_pkgver: bool = True, check_pkgname: bool = True)
     return ret
 
 
+def _apkbuild_worker(path: Path, check_pkgver: bool, check_pkgname: bool) -> Apkbuild:
+    # The Cache wrapper around apkbuild() can't be pickled, so the worker
+    # processes of parse_many() run this module level function instead
+    return apkbuild(path, check_pkgver, check_pkgname)
+
+
+# Starting and stopping the worker processes takes 10-25 ms, parsing an
+# APKBUILD that is not in $WORK/cache_apkbuild yet well below 1 ms. Parse
+# fewer APKBUILDs than this in the current process instead.
+parse_many_min_paths = 256
+
+
+def parse_many(
+    paths: list[Path], check_pkgver: bool = True, check_pkgname: bool = True
+) -> dict[Path, Apkbuild]:
+    """
+    Parse many APKBUILDs in parallel, with one worker process per CPU core.
+    Parsing is CPU bound, so this is faster than calling apkbuild() in a
+    loop when going through a large part of pmaports. The results are added
+    to the cache of apkbuild(), so later apkbuild() calls for the same paths
+    don't parse them again. With few APKBUILDs to parse or a single CPU core,
+    this is the same as calling apkbuild() in a loop.
+
+    :param paths: full paths to the APKBUILDs (or the aport folders)
+    :param check_pkgver: see apkbuild()
+    :param check_pkgname: see apkbuild()
+    :returns: dict of each path in paths to its parsed APKBUILD
+    """
+    cache = apkbuild.cache
+    keys = {path: cache.build_key(apkbuild.func, path) for path in paths}
+    todo = [path for path in paths if keys[path] not in cache.cache]
+    workers = min(os.cpu_count() or 1, len(todo))
+
+    # The workers must be forked, so they inherit the context and logging
+    # setup. Forking a process with multiple threads (e.g. the sudo timer)
+    # may deadlock and is deprecated since Python 3.12, so parse in this
+    # process if there are any.
+    can_fork = "fork" in multiprocessing.get_all_start_methods() and threading.active_count() == 1
+
+    if workers > 1 and len(todo) >= parse_many_min_paths and can_fork:
+        chunksize = max(1, min(32, len(todo) // workers))
+        mp_context = multiprocessing.get_context("fork")
+        with concurrent.futures.ProcessPoolExecutor(workers, mp_context) as executor:
+            results = executor.map(
+                _apkbuild_worker,
+                todo,
+                itertools.repeat(check_pkgver),
+                itertools.repeat(check_pkgname),
+                chunksize=chunksize,
+            )
+            for path, result in zip(todo, results):
+                key = keys[path]
+                if key is not None:
+                    cache.cache[key] = result
+
+    # Cache hits, unless the APKBUILDs were not parsed by workers above
+    return {path: apkbuild(path, check_pkgver, check_pkgname) for path in paths}
+
+
+@Cache("path", "prefix", "attributes")
+def _parse_subpackages_by_prefix(
+    path: Path, prefix: str, attributes: dict[str, dict[str, bool]]
+) -> dict[str, Any]:
+    """
+    Parse only some attributes of some subpackages from an APKBUILD. This is
+    a lot less work than apkbuild() for callers that only need e.g. the
+    pkgdesc of a few subpackages, as pkgver is not validated and the other
+    subpackages and attributes are skipped. Like apkbuild(), the result is
+    cached for the rest of the pmbootstrap run.
+
+    :param path: full path to the APKBUILD
+    :param prefix: only parse subpackages whose name starts with this
+    :param attributes: the attributes to parse from the subpackage functions
+    :returns: dict of subpackage name to its parsed attributes, or to None if
+              the subpackage function was not found
+    """
+    lines = read_file(path)
+
+    # Variables of the top-level package, to expand those mentioned in
+    # subpackages= and in the subpackage functions
+    variables = dict.fromkeys(pmb.config.apkbuild_attributes, "")
+    _parse_attributes(path, lines, {}, variables)
+
+    subpackages: OrderedDict[str, dict[str, Any] | None] = OrderedDict()
+    subpkgs = [
+        subpkg for subpkg in variables["subpackages"].split(" ") if subpkg.startswith(prefix)
+    ]
+    func_ranges = _function_ranges(lines) if subpkgs else {}
+    for subpkg in subpkgs:
+        _parse_subpackage(path, lines, func_ranges, variables, subpackages, subpkg, attributes)
+    return subpackages
+
+
 def kernels(device: str) -> dict[str, str] | None:
     """
     Get the possible kernels from a device-* APKBUILD.
@@ -393,14 +573,12 @@ def kernels(device: str) -> dict[str, str] | None:
     apkbuild_path = pmb.helpers.devices.find_path(device, "APKBUILD")
     if apkbuild_path is None:
         return None
-    subpackages = apkbuild(apkbuild_path)["subpackages"]
+    subpackage_prefix = f"device-{device}-kernel-"
+    subpackages = _parse_subpackages_by_prefix(apkbuild_path, subpackage_prefix, {"pkgdesc": {}})
 
     # Read kernels from subpackages
     ret = {}
-    subpackage_prefix = f"device-{device}-kernel-"
     for subpkgname, subpkg in subpackages.items():
-        if not subpkgname.startswith(subpackage_prefix):
-            continue
         if subpkg is None:
             raise RuntimeError(f"Cannot find subpackage function for: {subpkgname}")
         name = subpkgname[len(subpackage_prefix) :]
@@ -438,8 +616,13 @@ def maintainers(path: Path) -> list[str] | None:
     :param path: full path to the APKBUILD
     :returns: array of (at least one) maintainer, or None
     """
-    lines = read_file(path)
-    maintainers = _parse_comment_tags(lines, "Maintainer")
+    maintainers = []
+    co_maintainers = []
+    for line in read_file(path):
+        if line.startswith("# Maintainer:"):
+            maintainers.append(line[len("# Maintainer:") :].strip())
+        elif line.startswith("# Co-Maintainer:"):
+            co_maintainers.append(line[len("# Co-Maintainer:") :].strip())
     if not maintainers:
         return None
 
@@ -448,7 +631,7 @@ def maintainers(path: Path) -> list[str] | None:
     if len(maintainers) > 1:
         raise RuntimeError("Multiple Maintainer: lines in APKBUILD")
 
-    maintainers += _parse_comment_tags(lines, "Co-Maintainer")
+    maintainers += co_maintainers
     if "" in maintainers:
         raise RuntimeError("Empty (Co-)Maintainer: tag")
     return maintainers
@@ -1042,6 +1042,12 @@ def get_parser() -> argparse.ArgumentParser:
         " (that have been downloaded to the apk cache)",
     )
     zap.add_argument("-r", "--rust", action="store_true", help="also delete rust related caches")
+    zap.add_argument(
+        "--apkbuild-cache",
+        action="store_true",
+        dest="apkbuild_cache",
+        help="also delete the cache of parsed APKBUILDs",
+    )
 
     zap_all_delete_args = [
         "http",
@@ -1051,6 +1057,7 @@ def get_parser() -> argparse.ArgumentParser:
         "netboot",
         "pkgs_online_mismatch",
         "rust",
+        "apkbuild_cache",
     ]
     zap_all_delete_args_print = [arg.replace("_", "-") for arg in zap_all_delete_args]
     zap.add_argument(
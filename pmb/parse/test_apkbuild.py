@@ -0,0 +1,249 @@
+import os
+import pathlib
+
+import pytest
+
+from pmb.core.context import get_context
+import pmb.config
+import pmb.parse._apkbuild
+
+from ._apkbuild import (
+    _apkbuild_cache_fingerprint,
+    _function_ranges,
+    _parse_apkbuild,
+    _parse_apkbuild_cached,
+    apkbuild,
+    function_body,
+    kernels,
+    maintainers,
+    parse_many,
+    replace_variable,
+)
+
+
+def test_replace_variable() -> None:
+    values = {"pkgname": "hello-world", "pkgver": "1.2.3", "pkgrel": "4"}
+
+    assert replace_variable(values, "noarch") == "noarch"
+    assert replace_variable(values, "$pkgname") == "hello-world"
+    assert replace_variable(values, "${pkgname}-doc") == "hello-world-doc"
+    assert replace_variable(values, "$pkgname=$pkgver-r$pkgrel") == "hello-world=1.2.3-r4"
+    assert replace_variable(values, "${pkgver/./_}") == "1_2.3"
+    assert replace_variable(values, "${pkgver/./}") == "12.3"
+    assert replace_variable(values, "${pkgver/.}") == "12.3"
+    assert replace_variable(values, "${pkgname#hello-}") == "world"
+    assert replace_variable(values, "${pkgname#world}") == "hello-world"
+    assert replace_variable(values, "${pkgname#hello} ${pkgver}") == "-world 1.2.3"
+    assert replace_variable(values, "${pkgname/o/0} ${pkgrel}") == "hell0-world 4"
+
+    # Variables referenced inside ${var/foo/bar} and ${var#foo}
+    values = {
+        "pkgname": "linux-foo",
+        "pkgver": "6.1.2_rc3",
+        "_p": "linux-",
+        "_s": "_rc3",
+        "_flavor": "foo",
+    }
+    assert replace_variable(values, "${pkgname#$_p}") == "foo"
+    assert replace_variable(values, "${pkgname#${_p}}") == "foo"
+    assert replace_variable(values, "${pkgname#${_p}}-${pkgver}") == "foo-6.1.2_rc3"
+    assert replace_variable(values, "${pkgver/$_s/}") == "6.1.2"
+    assert replace_variable(values, "${pkgname/$_flavor/bar}") == "linux-bar"
+    assert replace_variable(values, "${pkgname/${_flavor}/$_s}") == "linux-_rc3"
+
+    # Unknown variables are kept as-is
+    assert replace_variable(values, "$missing ${missing}") == "$missing ${missing}"
+    assert replace_variable(values, "${missing/a/b} ${missing#a}") == "${missing/a/b} ${missing#a}"
+
+
+def test_apkbuild(device_package) -> None:
+    ret = apkbuild(device_package / "APKBUILD")
+
+    assert ret["pkgname"] == "device-qemu-amd64"
+    assert ret["pkgver"] == "6"
+    assert ret["pkgrel"] == "3"
+    assert ret["arch"] == ["x86_64"]
+    assert ret["options"] == ["!check", "!archcheck"]
+    assert ret["source"] == ["deviceinfo", "modules-initfs", "mce-display-blanking.conf"]
+    assert list(ret["subpackages"]) == [
+        "device-qemu-amd64-kernel-lts",
+        "device-qemu-amd64-kernel-virt",
+        "device-qemu-amd64-kernel-edge",
+        "device-qemu-amd64-kernel-none",
+        "device-qemu-amd64-mce",
+        "device-qemu-amd64-sway",
+    ]
+
+    kernel_lts = ret["subpackages"]["device-qemu-amd64-kernel-lts"]
+    assert kernel_lts["pkgdesc"] == "Alpine LTS kernel (recommended)"
+    assert kernel_lts["depends"] == ["linux-lts", "linux-firmware-none"]
+
+    # Attributes not set in the subpackage function are inherited
+    sway = ret["subpackages"]["device-qemu-amd64-sway"]
+    assert sway["pkgdesc"] == "Simulated device in QEMU (x86_64)"
+    assert sway["depends"] == ["postmarketos-ui-sway-logo-key-alt"]
+
+
+def test_function_ranges() -> None:
+    lines = [
+        'pkgname="hello-world"\n',
+        "build() {\n",
+        "\tmake\n",
+        "}\n",
+        "\n",
+        "doc() {\n",
+        "\tpkgdesc='docs'\n",
+        "\tdefault_doc\n",
+        "}\n",
+        "unclosed() {\n",
+        "\ttrue\n",
+    ]
+    assert _function_ranges(lines) == {
+        "build": (2, 3),
+        "doc": (6, 8),
+        "unclosed": (10, 0),
+    }
+
+
+def test_function_body(device_package) -> None:
+    path = device_package / "APKBUILD"
+
+    assert function_body(path, "build") == ["        devicepkg_build $startdir $pkgname\n"]
+    assert function_body(path, "sway") == [
+        '        install_if="$pkgname=$pkgver-r$pkgrel postmarketos-ui-sway"\n',
+        '        depends="postmarketos-ui-sway-logo-key-alt"\n',
+        '        mkdir "$subpkgdir"\n',
+    ]
+    assert function_body(path, "missing") == []
+
+
+def test_apkbuild_disk_cache(pmb_args, device_package, monkeypatch) -> None:
+    path = device_package / "APKBUILD"
+    cache_dir = get_context().config.work / "cache_apkbuild"
+
+    ret = _parse_apkbuild_cached(path)
+    assert ret == _parse_apkbuild(path)
+    assert len(list(cache_dir.iterdir())) == 1
+
+    # Cache hit: the APKBUILD doesn't get parsed again
+    def mock_parse_apkbuild(path):
+        raise AssertionError("APKBUILD parsed despite cache hit")
+
+    monkeypatch.setattr(pmb.parse._apkbuild, "_parse_apkbuild", mock_parse_apkbuild)
+    assert _parse_apkbuild_cached(path) == ret
+    monkeypatch.undo()
+
+    # Changing the attribute config invalidates the cache entry
+    attributes = {**pmb.config.apkbuild_attributes, "_pmb_test": {}}
+    monkeypatch.setattr(pmb.config, "apkbuild_attributes", attributes)
+    _apkbuild_cache_fingerprint.cache_clear()
+    assert _parse_apkbuild_cached(path)["_pmb_test"] == ""
+    monkeypatch.undo()
+    _apkbuild_cache_fingerprint.cache_clear()
+    assert "_pmb_test" not in _parse_apkbuild_cached(path)
+
+    # Changing the APKBUILD invalidates the cache entry
+    path.write_text(path.read_text().replace("pkgrel=3", "pkgrel=10"))
+    assert _parse_apkbuild_cached(path)["pkgrel"] == "10"
+    assert len(list(cache_dir.iterdir())) == 1
+
+    # Also if neither size nor mtime change, as with coarse timestamps
+    stat = path.stat()
+    path.write_text(path.read_text().replace("pkgrel=10", "pkgrel=11"))
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert _parse_apkbuild_cached(path)["pkgrel"] == "11"
+
+    # Failing to write the cache is not fatal, and leaves no temporary file
+    def mock_replace(self, target):
+        raise OSError("read-only file system")
+
+    monkeypatch.setattr(pathlib.Path, "replace", mock_replace)
+    path.write_text(path.read_text().replace("pkgrel=11", "pkgrel=12"))
+    assert _parse_apkbuild_cached(path)["pkgrel"] == "12"
+    monkeypatch.undo()
+    assert len(list(cache_dir.iterdir())) == 1
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_parse_many(device_package, tmp_path, monkeypatch, parallel) -> None:
+    paths = [device_package / "APKBUILD", tmp_path / "hello-world" / "APKBUILD"]
+    paths[1].parent.mkdir()
+    paths[1].write_text("pkgname=hello-world\npkgver=1\npkgrel=0\n")
+    expected = {path: _parse_apkbuild(path) for path in paths}
+
+    if parallel:
+        # Use worker processes even here, with few APKBUILDs on one core
+        monkeypatch.setattr(pmb.parse._apkbuild, "parse_many_min_paths", 1)
+        monkeypatch.setattr(os, "cpu_count", lambda: 2)
+    assert parse_many(paths) == expected
+
+    # The results were added to the cache of apkbuild()
+    def mock_parse_apkbuild_cached(path):
+        raise AssertionError("APKBUILD parsed again after parse_many()")
+
+    monkeypatch.setattr(pmb.parse._apkbuild, "_parse_apkbuild_cached", mock_parse_apkbuild_cached)
+    assert {path: apkbuild(path) for path in paths} == expected
+    assert parse_many(paths) == expected
+
+
+def test_apkbuild_multiline_value(tmp_path) -> None:
+    path = tmp_path / "hello-world" / "APKBUILD"
+    path.parent.mkdir()
+    path.write_text(
+        "pkgname=hello-world\n"
+        "pkgver=1\n"
+        "pkgrel=0\n"
+        'pkgdesc="first line\n'
+        'pkgrel=5"\n'
+        'depends="\n'
+        "\tfirst-pkg\n"
+        "\tsecond-pkg\n"
+        '\t"\n'
+    )
+    ret = apkbuild(path)
+
+    # Lines inside multi-line values don't get parsed as attributes
+    assert ret["pkgdesc"] == "first line pkgrel=5"
+    assert ret["pkgrel"] == "0"
+    assert ret["depends"] == ["first-pkg", "second-pkg"]
+
+
+def test_maintainers(device_package) -> None:
+    assert maintainers(device_package / "APKBUILD") == [
+        "Minecrell <minecrell@minecrell.net>",
+        "Oliver Smith <ollieparanoid@postmarketos.org>",
+    ]
+
+
+def test_apkbuild_check_pkgname(tmp_path) -> None:
+    aport = tmp_path / "hello-world"
+    aport.mkdir()
+    (aport / "APKBUILD").write_text("pkgname=hello-world\npkgver=1\npkgrel=0\n")
+
+    # The folder name is checked after resolving symlinks
+    (tmp_path / "link").symlink_to(aport)
+    assert apkbuild(tmp_path / "link" / "APKBUILD")["pkgname"] == "hello-world"
+
+    other = tmp_path / "other"
+    other.mkdir()
+    (other / "APKBUILD").write_text("pkgname=hello-world\npkgver=1\npkgrel=0\n")
+    with pytest.raises(RuntimeError, match="pkgname must be equal to the name of"):
+        apkbuild(other / "APKBUILD")
+    assert apkbuild(other / "APKBUILD", check_pkgname=False)["pkgname"] == "hello-world"
+
+
+def test_kernels(mock_devices_find_path, monkeypatch) -> None:
+    expected = {
+        "lts": "Alpine LTS kernel (recommended)",
+        "virt": "Alpine Virt kernel (minimal, no audio/mouse/network)",
+        "edge": "Alpine Edge kernel",
+        "none": "No kernel (does not boot! can be used during pmbootstrap testing to save time)",
+    }
+    assert kernels("qemu-amd64") == expected
+
+    # The subpackages are cached, like the result of apkbuild()
+    def mock_read_file(path):
+        raise AssertionError("APKBUILD read again despite cache hit")
+
+    monkeypatch.setattr(pmb.parse._apkbuild, "read_file", mock_read_file)
+    assert kernels("qemu-amd64") == expected
@@ -15,6 +15,9 @@ RunOutputType = RunOutputTypeDefault | RunOutputTypePopen
 RunReturnType = str | int | subprocess.Popen
 PathString = Path | str
 Env = dict[str, PathString]
+# Parsed APKBUILD as returned by pmb.parse.apkbuild(), with the keys from
+# pmb.config.apkbuild_attributes. Kept as a plain dict, so it can be dumped
+# as JSON (apkbuild_parse, $WORK/cache_apkbuild).
 Apkbuild = dict[str, Any]
 WithExtraRepos = Literal["default", "enabled", "disabled"]
 
@@ -65,6 +68,7 @@ class PmbArgs(Namespace):
     all_git: bool
     all_stable: bool
     android_recovery_zip: bool
+    apkbuild_cache: bool
     apkindex_path: Path
     aports: list[Path] | None
     arch: Arch | None